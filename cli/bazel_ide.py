@@ -9,57 +9,151 @@ Usage:
 """
 
 import argparse
-import json
+import functools
 import os
+import queue
+import re
+import signal
 import subprocess
 import sys
 import time
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Optional, Set
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
 import threading
 import hashlib
 
 try:
     from watchdog.observers import Observer
-    from watchdog.events import FileSystemEventHandler, FileSystemEvent
+    from watchdog.events import (
+        FileSystemEvent,
+        FileSystemEventHandler,
+        RegexMatchingEventHandler,
+    )
+    from watchdog.observers.api import BaseObserver, ObservedWatch
     WATCHDOG_AVAILABLE = True
 except ImportError:
     WATCHDOG_AVAILABLE = False
     print("Warning: watchdog not installed. File watching disabled.", file=sys.stderr)
     print("Install with: pip install watchdog", file=sys.stderr)
 
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+# Files that mark the root of a Bazel workspace
+WORKSPACE_MARKERS = frozenset({"WORKSPACE", "WORKSPACE.bazel", "MODULE.bazel"})
+
+# Files to watch: BUILD, WORKSPACE, MODULE.bazel.lock and anything ending in .bzl or
+# .bazel (which covers BUILD.bazel, WORKSPACE.bazel and MODULE.bazel)
+_BAZEL_FILE_RE = re.compile(
+    r"(?:^|[/\\])(?:BUILD|WORKSPACE|MODULE\.bazel\.lock|[^/\\]+\.(?:bzl|bazel))$",
+    re.ASCII,
+)
+
+# Directories whose contents never affect the build graph, ignored at any depth.
+# Bazel's convenience symlinks (bazel-bin, bazel-out, ...) are ignored at the root.
+IGNORED_DIRS = frozenset({".git", "node_modules"})
+CONVENIENCE_SYMLINK_PREFIX = "bazel-"
+
+# Each separately watched top-level directory costs an emitter thread and an
+# inotify instance, and the default limit of 128 instances is shared by every
+# watcher the user runs; past this many, one recursive watch is used instead
+MAX_TOP_LEVEL_WATCHES = 8
+
+# Event types that mean a file changed; opened/closed events from reads
+# (bazel itself reads BUILD files during a refresh) are ignored
+CHANGE_EVENT_TYPES = frozenset({"created", "deleted", "modified", "moved"})
+
+# Repeats of the same event for the same file within this window are dropped
+DEDUPE_WINDOW_NS = 500_000_000
+MAX_SEEN_EVENTS = 512
+
+# Per-event log lines waiting to be written beyond this are dropped
+LOG_QUEUE_MAX = 1000
+
+# Read size used when hashing compile_commands.json
+HASH_CHUNK_SIZE = 1 << 20
 
-# File patterns to watch
-WATCH_PATTERNS = {
-    "BUILD",
-    "BUILD.bazel",
-    "WORKSPACE",
-    "WORKSPACE.bazel",
-    "MODULE.bazel",
-    "MODULE.bazel.lock",
-}
-WATCH_EXTENSIONS = {".bzl", ".bazel"}
+# Upper bound on how long a continuous stream of changes can defer a refresh,
+# as a multiple of the debounce delay
+MAX_BATCH_LATENCY_FACTOR = 5
+
+
+_log_queue: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+_log_writer: Optional[threading.Thread] = None
+_log_writer_lock = threading.Lock()
+
+
+def _write_log_lines():
+    while True:
+        print(_log_queue.get(), flush=True)
+
+
+def log_nowait(message: str):
+    """Print a message from a background thread so the caller never blocks on stdout."""
+    global _log_writer
+    if _log_writer is None:
+        with _log_writer_lock:
+            if _log_writer is None:
+                _log_writer = threading.Thread(target=_write_log_lines, daemon=True)
+                _log_writer.start()
+
+    if _log_queue.qsize() < LOG_QUEUE_MAX:
+        _log_queue.put_nowait(message)
 
 
 def find_workspace_root() -> Optional[Path]:
     """Find the Bazel workspace root by looking for WORKSPACE or MODULE.bazel."""
-    current = Path.cwd()
-    while current != current.parent:
-        if (current / "WORKSPACE").exists() or (current / "WORKSPACE.bazel").exists():
-            return current
-        if (current / "MODULE.bazel").exists():
-            return current
-        current = current.parent
-    return None
+    current = os.getcwd()
+    while True:
+        try:
+            entries = os.listdir(current)
+        except OSError:
+            entries = []
+        if not WORKSPACE_MARKERS.isdisjoint(entries):
+            return Path(current)
+
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
 
 
+def read_bazelignore(workspace_root: Path) -> List[str]:
+    """Read the workspace-relative directories listed in .bazelignore."""
+    try:
+        with open(workspace_root / ".bazelignore") as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return []
+
+    entries = []
+    for line in lines:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            entries.append(line.rstrip("/"))
+    return entries
+
+
+@functools.lru_cache(maxsize=4096)
 def is_bazel_file(path: str) -> bool:
     """Check if a file is a Bazel-related file that should trigger refresh."""
-    name = os.path.basename(path)
-    if name in WATCH_PATTERNS:
-        return True
-    _, ext = os.path.splitext(name)
-    return ext in WATCH_EXTENSIONS
+    return _BAZEL_FILE_RE.search(path) is not None
+
+
+def hash_file(path: Path) -> str:
+    """Hash a file's contents for change detection (xxh64, or blake2b without xxhash)."""
+    h = xxhash.xxh64() if XXHASH_AVAILABLE else hashlib.blake2b(digest_size=8)
+    # Read in bounded chunks rather than mmap: the file may be rewritten in place
+    # by another refresh, and touching a truncated mapping raises SIGBUS
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
 
 class RefreshManager:
@@ -78,86 +172,181 @@ class RefreshManager:
         self.debounce_ms = debounce_ms
 
         self._pending_refresh = False
-        self._last_trigger_time = 0.0
-        self._refresh_lock = threading.Lock()
+        self._first_trigger_ns = 0
+        self._last_trigger_ns = 0
+        self._last_refresh_end_ns = 0
+        self._refresh_cond = threading.Condition()
         self._refresh_thread: Optional[threading.Thread] = None
         self._last_content_hash: Optional[str] = None
+        self._last_stat: Optional[Tuple[int, int]] = None
+        self._refresh_cmd: Optional[List[str]] = None
+        self._current_proc: Optional[subprocess.Popen] = None
+        self._cancellable = False
+        self._cancelled = False
 
     def trigger_refresh(self):
         """Trigger a debounced refresh."""
-        with self._refresh_lock:
-            self._pending_refresh = True
-            self._last_trigger_time = time.time()
+        # Attribute stores are atomic under the GIL. While a batch is pending the
+        # worker re-reads the timestamp itself, so only the first trigger of a
+        # batch has to take the lock and wake it.
+        now = time.monotonic_ns()
+        self._last_trigger_ns = now
+        if self._pending_refresh:
+            return
+
+        with self._refresh_cond:
+            if not self._pending_refresh:
+                self._pending_refresh = True
+                self._first_trigger_ns = now
+                # A leading-edge refresh still running reflects stale files;
+                # cancel it and let this batch replace it
+                if self._cancellable:
+                    self.cancel_refresh()
 
             # Start debounce thread if not running
             if self._refresh_thread is None or not self._refresh_thread.is_alive():
                 self._refresh_thread = threading.Thread(target=self._debounce_loop, daemon=True)
                 self._refresh_thread.start()
+            self._refresh_cond.notify()
 
     def _debounce_loop(self):
-        """Wait for debounce period, then refresh if no new triggers."""
+        """Refresh on the leading edge of a burst, then batch until quiet.
+
+        A trigger arriving after at least ``debounce_ms`` of idleness refreshes
+        immediately. Triggers arriving sooner are coalesced and flushed once no
+        new trigger has been seen for ``debounce_ms``, or at the latest
+        ``MAX_BATCH_LATENCY_FACTOR * debounce_ms`` after the first one. A change
+        arriving during a leading-edge refresh cancels it and starts a batch.
+        """
+        quiet_ns = self.debounce_ms * 1_000_000
+        max_latency_ns = quiet_ns * MAX_BATCH_LATENCY_FACTOR
         while True:
-            time.sleep(self.debounce_ms / 1000.0)
+            with self._refresh_cond:
+                while not self._pending_refresh:
+                    self._refresh_cond.wait()
+
+                leading_edge = time.monotonic_ns() - self._last_refresh_end_ns >= quiet_ns
+                if not leading_edge:
+                    while True:
+                        flush_at_ns = min(
+                            self._last_trigger_ns + quiet_ns,
+                            self._first_trigger_ns + max_latency_ns,
+                        )
+                        remaining_ns = flush_at_ns - time.monotonic_ns()
+                        if remaining_ns <= 0:
+                            break
+                        self._refresh_cond.wait(remaining_ns / 1e9)
+
+                self._pending_refresh = False
+                # A batched refresh already covers a burst and always runs to
+                # completion, so a steady stream of changes still gets refreshes
+                self._cancellable = leading_edge
+
+            self._do_refresh()
+            # Also after a cancelled refresh, so its restart is batched
+            self._last_refresh_end_ns = time.monotonic_ns()
+
+    def cancel_refresh(self):
+        """Interrupt the refresh command if one is running."""
+        proc = self._current_proc
+        if proc is None or proc.poll() is not None:
+            return
 
-            with self._refresh_lock:
-                elapsed = (time.time() - self._last_trigger_time) * 1000
-                if elapsed >= self.debounce_ms and self._pending_refresh:
-                    self._pending_refresh = False
-                    break
-                elif not self._pending_refresh:
-                    return
+        self._cancelled = True
+        try:
+            if hasattr(os, "killpg"):
+                # Like Ctrl+C, so bazel cancels the command on its server
+                os.killpg(proc.pid, signal.SIGINT)
+            else:
+                proc.terminate()
+        except OSError:
+            pass
 
-        # Perform refresh
-        self._do_refresh()
+    def _detect_refresh_cmd(self) -> Optional[List[str]]:
+        """Find the compile_commands generator, preferring hedron's refresh_all."""
+        for target in ("@hedron_compile_commands//:refresh_all", "//:refresh_compile_commands"):
+            result = subprocess.run(
+                ["bazel", "query", target],
+                cwd=self.workspace_root,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            if result.returncode == 0:
+                return ["bazel", "run", target]
+        return None
+
+    def warm_up(self):
+        """Start the Bazel server and detect the generator ahead of the first refresh."""
+        try:
+            if self._refresh_cmd is None:
+                self._refresh_cmd = self._detect_refresh_cmd()
+        except OSError:
+            # Reported by the first refresh
+            pass
 
     def _do_refresh(self):
         """Actually run the refresh command."""
         print(f"\n[bazel-ide] Refreshing compile_commands.json for {self.targets}...")
-        start_time = time.time()
+        start_ns = time.monotonic_ns()
 
         try:
-            # Check if hedron extractor is available
-            result = subprocess.run(
-                ["bazel", "query", "@hedron_compile_commands//:refresh_all"],
+            # The generator target cannot change mid-session; detect it once
+            if self._refresh_cmd is None:
+                self._refresh_cmd = self._detect_refresh_cmd()
+            if self._refresh_cmd is None:
+                print("[bazel-ide] No compile_commands generator found.", file=sys.stderr)
+                print("[bazel-ide] Add hedron_compile_commands to your MODULE.bazel", file=sys.stderr)
+                return
+
+            # Run the refresh in its own process group so it can be cancelled
+            self._cancelled = False
+            proc = subprocess.Popen(
+                self._refresh_cmd,
                 cwd=self.workspace_root,
-                capture_output=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 text=True,
+                errors="replace",
+                start_new_session=True,
             )
-
-            if result.returncode == 0:
-                # Use hedron extractor
-                cmd = ["bazel", "run", "@hedron_compile_commands//:refresh_all"]
-            else:
-                # Fall back to local refresh_compile_commands if defined
-                result = subprocess.run(
-                    ["bazel", "query", "//:refresh_compile_commands"],
-                    cwd=self.workspace_root,
-                    capture_output=True,
-                    text=True,
-                )
-                if result.returncode == 0:
-                    cmd = ["bazel", "run", "//:refresh_compile_commands"]
-                else:
-                    print("[bazel-ide] No compile_commands generator found.", file=sys.stderr)
-                    print("[bazel-ide] Add hedron_compile_commands to your MODULE.bazel", file=sys.stderr)
-                    return
-
-            # Run the refresh
-            result = subprocess.run(
-                cmd,
-                cwd=self.workspace_root,
-                capture_output=True,
-                text=True,
-            )
-
-            elapsed = time.time() - start_time
-
-            if result.returncode == 0:
+            self._current_proc = proc
+            # Only the last few lines of bazel's progress output are ever shown
+            stderr_tail: Deque[str] = deque(maxlen=5)
+            try:
+                for line in proc.stderr:
+                    if line.strip():
+                        stderr_tail.append(line.rstrip())
+                proc.wait()
+            except KeyboardInterrupt:
+                # The refresh has its own session and does not see Ctrl+C itself
+                self.cancel_refresh()
+                raise
+            finally:
+                self._current_proc = None
+                proc.stderr.close()
+
+            elapsed = (time.monotonic_ns() - start_ns) / 1e9
+
+            if self._cancelled:
+                print(f"[bazel-ide] Refresh interrupted by new changes ({elapsed:.1f}s)")
+                return
+
+            if proc.returncode == 0:
                 # Check if content actually changed
                 output_path = self.workspace_root / self.output_file
-                if output_path.exists():
-                    with open(output_path, "rb") as f:
-                        content_hash = hashlib.md5(f.read()).hexdigest()
+                try:
+                    st = output_path.stat()
+                except FileNotFoundError:
+                    st = None
+
+                if st is not None:
+                    # Same size and mtime means the file was not rewritten
+                    stat_key = (st.st_size, st.st_mtime_ns)
+                    if stat_key == self._last_stat:
+                        content_hash = self._last_content_hash
+                    else:
+                        content_hash = hash_file(output_path)
+                        self._last_stat = stat_key
 
                     if content_hash != self._last_content_hash:
                         self._last_content_hash = content_hash
@@ -168,11 +357,8 @@ class RefreshManager:
                     print(f"[bazel-ide] Refreshed in {elapsed:.1f}s")
             else:
                 print(f"[bazel-ide] Refresh failed ({elapsed:.1f}s):", file=sys.stderr)
-                if result.stderr:
-                    # Print last few lines of error
-                    lines = result.stderr.strip().split('\n')
-                    for line in lines[-5:]:
-                        print(f"  {line}", file=sys.stderr)
+                for line in stderr_tail:
+                    print(f"  {line}", file=sys.stderr)
 
         except Exception as e:
             print(f"[bazel-ide] Error: {e}", file=sys.stderr)
@@ -182,35 +368,211 @@ class RefreshManager:
         self._do_refresh()
 
 
-class BazelFileHandler(FileSystemEventHandler):
-    """Handles file system events for Bazel files."""
+class BazelFileHandler(RegexMatchingEventHandler):
+    """Handles file system events for Bazel files.
+
+    Non-Bazel files, directories and anything under an ignored directory are
+    filtered out by watchdog's dispatch before ``on_any_event`` is called.
+    """
 
-    def __init__(self, refresh_manager: RefreshManager):
+    def __init__(self, refresh_manager: RefreshManager, ignored_paths: Iterable[str] = ()):
+        root = str(refresh_manager.workspace_root)
+        ignore_regexes = [
+            r"{root}[/\\](?:{symlink}[^/\\]+|(?:.*[/\\])?(?:{dirs}))[/\\]".format(
+                root=re.escape(root),
+                symlink=re.escape(CONVENIENCE_SYMLINK_PREFIX),
+                dirs="|".join(re.escape(name) for name in sorted(IGNORED_DIRS)),
+            )
+        ]
+        ignore_regexes += [
+            re.escape(os.path.normpath(os.path.join(root, path))) + r"(?:[/\\]|$)"
+            for path in ignored_paths
+        ]
+        super().__init__(
+            regexes=[".*" + _BAZEL_FILE_RE.pattern],
+            ignore_regexes=ignore_regexes,
+            ignore_directories=True,
+            case_sensitive=True,
+        )
         self.refresh_manager = refresh_manager
-        self._seen_events: Set[str] = set()
+        self._seen_events: "OrderedDict[str, int]" = OrderedDict()
 
     def on_any_event(self, event: FileSystemEvent):
-        if event.is_directory:
+        if event.event_type not in CHANGE_EVENT_TYPES:
             return
 
         path = event.src_path
         if not is_bazel_file(path):
-            return
+            # Renamed onto a Bazel file, e.g. an editor's atomic save
+            path = event.dest_path
 
         # Deduplicate rapid events for same file
         event_key = f"{event.event_type}:{path}"
-        if event_key in self._seen_events:
+        now = time.monotonic_ns()
+        last_seen = self._seen_events.get(event_key)
+        if last_seen is not None and now - last_seen < DEDUPE_WINDOW_NS:
             return
-        self._seen_events.add(event_key)
-
-        # Clear seen events periodically
-        if len(self._seen_events) > 1000:
-            self._seen_events.clear()
+        self._seen_events[event_key] = now
+        self._seen_events.move_to_end(event_key)
+        while len(self._seen_events) > MAX_SEEN_EVENTS:
+            self._seen_events.popitem(last=False)
 
-        print(f"[bazel-ide] Detected change: {os.path.basename(path)}")
+        log_nowait(f"[bazel-ide] Detected change: {os.path.basename(path)}")
         self.refresh_manager.trigger_refresh()
 
 
+class TopLevelWatcher(FileSystemEventHandler):
+    """Watches each non-ignored top-level workspace directory separately.
+
+    Ignored trees such as node_modules are then never walked or registered with
+    the OS. The root itself is watched non-recursively, both for top-level Bazel
+    files and to follow top-level directories being created, moved or deleted.
+    Once more than ``MAX_TOP_LEVEL_WATCHES`` directories would be watched, or if
+    adding a watch fails (e.g. out of inotify instances), it falls back to a
+    single recursive watch on the root. The observer must already be running so
+    that scheduling errors surface here.
+    """
+
+    def __init__(
+        self,
+        observer: BaseObserver,
+        handler: BazelFileHandler,
+        ignored_paths: Iterable[str] = (),
+    ):
+        self._observer = observer
+        self._handler = handler
+        self._ignored_paths = [os.path.normpath(path) for path in ignored_paths]
+        self._ignored_names = IGNORED_DIRS.union(self._ignored_paths)
+        self._ignored_abspaths: Set[str] = set()
+        self._watches: Dict[str, ObservedWatch] = {}
+        self._scan_queue: "queue.SimpleQueue[str]" = queue.SimpleQueue()
+        self._scanner: Optional[threading.Thread] = None
+        self._root_watch: Optional[ObservedWatch] = None
+
+    def is_ignored(self, name: str) -> bool:
+        return name in self._ignored_names or name.startswith(CONVENIENCE_SYMLINK_PREFIX)
+
+    def schedule(self, workspace_root: Path):
+        """Schedule watches for the workspace, splitting the root watch if it helps."""
+        root = str(workspace_root)
+        subdirs = []
+        skipped = False
+        with os.scandir(root) as it:
+            for entry in it:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+                if self.is_ignored(entry.name):
+                    skipped = True
+                else:
+                    subdirs.append(entry.path)
+
+        if not skipped or len(subdirs) > MAX_TOP_LEVEL_WATCHES:
+            self._observer.schedule(self._handler, root, recursive=True)
+            return
+
+        self._root = root
+        self._ignored_abspaths = {os.path.join(root, path) for path in self._ignored_paths}
+        try:
+            self._observer.schedule(self._handler, root, recursive=False)
+            self._root_watch = self._observer.schedule(self, root, recursive=False)
+            # Scheduled one at a time: watchdog starts each emitter under the
+            # observer lock, so a thread pool would not overlap the registrations
+            for path in subdirs:
+                self._add(path)
+        except OSError as e:
+            print(f"[bazel-ide] Warning: {e}; using a single watch", file=sys.stderr)
+            self._watch_root_recursively()
+
+    def _add(self, path: str):
+        if path not in self._watches and not self.is_ignored(os.path.basename(path)):
+            self._watches[path] = self._observer.schedule(self._handler, path, recursive=True)
+
+    def _remove(self, path: str):
+        watch = self._watches.pop(path, None)
+        if watch is not None:
+            try:
+                self._observer.unschedule(watch)
+            except KeyError:
+                pass
+
+    def _add_new(self, path: str):
+        """Watch a top-level directory that appeared after startup.
+
+        Its contents may already exist by the time the watch is in place (e.g.
+        after ``git checkout``), so it is also scanned for Bazel files. The scan
+        runs on a background thread to keep watchdog's dispatch thread free.
+        """
+        if path in self._watches or self.is_ignored(os.path.basename(path)):
+            return
+
+        try:
+            if len(self._watches) < MAX_TOP_LEVEL_WATCHES:
+                self._add(path)
+            else:
+                self._watch_root_recursively()
+        except OSError as e:
+            # This runs on watchdog's dispatch thread; letting the error escape
+            # would silently kill the observer
+            print(f"[bazel-ide] Warning: {e}; using a single watch", file=sys.stderr)
+            try:
+                self._watch_root_recursively()
+            except OSError as e:
+                print(f"[bazel-ide] Error: cannot watch workspace: {e}", file=sys.stderr)
+                self._observer.stop()
+                return
+
+        if self._scanner is None:
+            self._scanner = threading.Thread(target=self._scan_new_dirs, daemon=True)
+            self._scanner.start()
+        self._scan_queue.put_nowait(path)
+
+    def _watch_root_recursively(self):
+        """Replace the split watches with one recursive watch on the root."""
+        # Drop the split watches first to release their inotify instances
+        for watch in [self._root_watch, *self._watches.values()]:
+            if watch is None:
+                continue
+            try:
+                self._observer.unschedule(watch)
+            except KeyError:
+                pass
+        self._root_watch = None
+        self._watches.clear()
+        self._observer.schedule(self._handler, self._root, recursive=True)
+
+    def _scan_new_dirs(self):
+        while True:
+            path = self._scan_queue.get()
+            if self._contains_bazel_file(path):
+                log_nowait(f"[bazel-ide] Detected new directory: {os.path.basename(path)}")
+                self._handler.refresh_manager.trigger_refresh()
+
+    def _contains_bazel_file(self, path: str) -> bool:
+        for dirpath, dirnames, filenames in os.walk(path):
+            dirnames[:] = [
+                name
+                for name in dirnames
+                if name not in IGNORED_DIRS
+                and os.path.join(dirpath, name) not in self._ignored_abspaths
+            ]
+            if any(is_bazel_file(name) for name in filenames):
+                return True
+        return False
+
+    def on_created(self, event: FileSystemEvent):
+        if event.is_directory:
+            self._add_new(event.src_path)
+
+    def on_deleted(self, event: FileSystemEvent):
+        if event.is_directory:
+            self._remove(event.src_path)
+
+    def on_moved(self, event: FileSystemEvent):
+        if event.is_directory:
+            self._remove(event.src_path)
+            self._add_new(event.dest_path)
+
+
 def cmd_watch(args):
     """Watch for BUILD file changes and auto-refresh."""
     if not WATCHDOG_AVAILABLE:
@@ -239,20 +601,40 @@ def cmd_watch(args):
     # Initial refresh
     if args.initial_refresh:
         refresh_manager.refresh_now()
+    else:
+        # Start the Bazel server now so the first refresh does not pay for it
+        threading.Thread(target=refresh_manager.warm_up, daemon=True).start()
 
     # Start watching
-    event_handler = BazelFileHandler(refresh_manager)
+    ignored_paths = read_bazelignore(workspace_root)
+    event_handler = BazelFileHandler(refresh_manager, ignored_paths)
     observer = Observer()
-    observer.schedule(event_handler, str(workspace_root), recursive=True)
     observer.start()
+    try:
+        TopLevelWatcher(observer, event_handler, ignored_paths).schedule(workspace_root)
+    except OSError as e:
+        print(f"Error: Cannot watch workspace: {e}", file=sys.stderr)
+        observer.stop()
+        sys.exit(1)
 
     try:
-        while True:
-            time.sleep(1)
+        # Block until Ctrl+C or the observer stops, without waking up every
+        # second; lock waits are only interruptible by signals on POSIX
+        if os.name == "posix":
+            observer.join()
+        else:
+            while observer.is_alive():
+                observer.join(1)
     except KeyboardInterrupt:
         print("\n[bazel-ide] Stopping...")
         observer.stop()
-    observer.join()
+        refresh_manager.cancel_refresh()
+        observer.join()
+    else:
+        # The observer only stops on its own after a fatal error
+        print("[bazel-ide] File watcher stopped", file=sys.stderr)
+        refresh_manager.cancel_refresh()
+        sys.exit(1)
 
 
 def cmd_refresh(args):
@@ -281,17 +663,21 @@ def cmd_status(args):
 
     # Check compile_commands.json
     cc_path = workspace_root / "compile_commands.json"
-    if cc_path.exists():
+    try:
         stat = cc_path.stat()
+    except FileNotFoundError:
+        stat = None
+
+    if stat is not None:
         mtime = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(stat.st_mtime))
         size = stat.st_size / 1024
 
-        # Count entries
+        # Count entries without parsing; each entry has exactly one "file" key
         try:
-            with open(cc_path) as f:
-                entries = len(json.load(f))
+            with open(cc_path, "rb") as f:
+                entries = f.read().count(b'"file":')
             print(f"compile_commands.json: {entries} entries, {size:.1f}KB, updated {mtime}")
-        except:
+        except OSError:
             print(f"compile_commands.json: {size:.1f}KB, updated {mtime}")
     else:
         print("compile_commands.json: Not found")
@@ -300,8 +686,8 @@ def cmd_status(args):
     result = subprocess.run(
         ["bazel", "query", "@hedron_compile_commands//:refresh_all"],
         cwd=workspace_root,
-        capture_output=True,
-        text=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
     )
     if result.returncode == 0:
         print("hedron_compile_commands: Installed")
@@ -312,8 +698,8 @@ def cmd_status(args):
     result = subprocess.run(
         ["bazel", "query", "//:refresh_compile_commands"],
         cwd=workspace_root,
-        capture_output=True,
-        text=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
     )
     if result.returncode == 0:
         print("Local refresh target: Available (//:refresh_compile_commands)")